@@ -23,12 +23,13 @@
     # Clasificación del módulo
     # Categorías disponibles en: https://github.com/odoo/odoo/blob/18.0/odoo/addons/base/data/ir_module_category_data.xml
     'category': 'Productivity',  # Categoría más apropiada para herramientas de productividad
-    'version': '18.0.1.0.0',  # Formato: [versión_odoo].[major].[minor].[patch]
+    'version': '18.0.1.1.0',  # Formato: [versión_odoo].[major].[minor].[patch]
 
     # Dependencias del módulo
     'depends': [
         'base', # Módulo base de Odoo (siempre requerido)
         'relex_api',
+        'bus',  # Notificaciones de cambios de estado a las vistas
     ],
 
     # Dependencias externas de Python (paquetes que se deben instalar)
@@ -43,8 +44,20 @@
 
         # Archivos de vistas (interfaz de usuario)
         'views/templates.xml',  # Vistas principales del módulo
+        'views/trabajo_views.xml',  # Historial de trabajos de impresión
+        'views/llamada_lenta_views.xml',  # Registro de llamadas lentas al middleware
+
+        # Datos (acciones planificadas)
+        'data/ir_cron.xml',
     ],
 
+    # Recursos web (JavaScript) cargados en el backend
+    'assets': {
+        'web.assets_backend': [
+            'impresoras/static/src/js/estado_impresoras_service.js',
+        ],
+    },
+
     # Configuraciones adicionales
     'installable': True,  # El módulo se puede instalar
     'auto_install': False,  # No se instala automáticamente
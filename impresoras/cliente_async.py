@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente concurrente para el middleware de impresoras.
+
+Mantiene un event loop de asyncio en un hilo dedicado por worker y permite
+ejecutar varias llamadas al middleware en paralelo, con concurrencia acotada,
+desde código síncrono del ORM.
+
+Las funciones ejecutadas no deben usar el entorno de Odoo (cursor, registros):
+no es seguro compartirlo entre hilos. Solo deben hacer la petición HTTP.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+
+_logger = logging.getLogger(__name__)
+
+# Cantidad máxima de llamadas simultáneas al middleware por worker
+CONCURRENCIA_MAX = 8
+
+# Tiempo máximo de espera de un lote de llamadas (segundos)
+TIMEOUT_LOTE = 30
+
+
+class ClienteMiddlewareAsync:
+    """
+    Ejecuta llamadas bloqueantes al middleware de forma concurrente sobre asyncio.
+
+    El event loop se crea la primera vez que se usa y se vuelve a crear si el
+    proceso cambió (los workers de Odoo se crean con fork y no heredan hilos).
+    """
+
+    def __init__(self, concurrencia=CONCURRENCIA_MAX):
+        self.concurrencia = concurrencia
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self):
+        """
+        Obtiene el event loop del worker, iniciando su hilo si todavía no existe.
+
+        Returns:
+            asyncio.AbstractEventLoop: Event loop en ejecución
+        """
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or not self._loop.is_running():
+                loop = asyncio.new_event_loop()
+                hilo = threading.Thread(
+                    target=loop.run_forever,
+                    name='impresoras-cliente-async',
+                    daemon=True,
+                )
+                hilo.start()
+                self._loop = loop
+                self._pid = os.getpid()
+            return self._loop
+
+    async def _ejecutar_lote(self, llamadas):
+        """
+        Ejecuta las llamadas en paralelo respetando la concurrencia máxima.
+
+        Args:
+            llamadas (list): Funciones sin argumentos a ejecutar
+
+        Returns:
+            list: Resultados o excepciones, en el mismo orden que las llamadas
+        """
+        semaforo = asyncio.Semaphore(self.concurrencia)
+
+        async def ejecutar(llamada):
+            async with semaforo:
+                # requests es bloqueante: cada llamada corre en el executor del loop
+                return await asyncio.to_thread(llamada)
+
+        return await asyncio.gather(*(ejecutar(llamada) for llamada in llamadas), return_exceptions=True)
+
+    def ejecutar(self, llamadas, timeout=TIMEOUT_LOTE):
+        """
+        Fachada síncrona: ejecuta las llamadas en paralelo y espera sus resultados.
+
+        Args:
+            llamadas (list): Funciones sin argumentos a ejecutar
+            timeout (int): Tiempo máximo de espera del lote, en segundos
+
+        Returns:
+            list: Resultados o excepciones, en el mismo orden que las llamadas
+        """
+        if not llamadas:
+            return []
+        if len(llamadas) == 1:
+            # Una sola llamada no justifica el cambio de hilo
+            try:
+                return [llamadas[0]()]
+            except Exception as e:
+                return [e]
+        futuro = asyncio.run_coroutine_threadsafe(self._ejecutar_lote(llamadas), self._get_loop())
+        try:
+            return futuro.result(timeout)
+        except Exception:
+            # No dejar el lote corriendo en el loop si quien espera ya no lo usará
+            futuro.cancel()
+            raise
+
+
+# Cliente compartido por el worker
+cliente_middleware = ClienteMiddlewareAsync()
@@ -1,16 +1,33 @@
 # -*- coding: utf-8 -*-
 
 # Importaciones necesarias de Odoo y Python
-from odoo import http
+from odoo import http, fields
 from odoo.http import request
 import requests
+import functools
+import json
 import logging
+import time
 
 from odoo.addons.relex_api.constants import build_url
 
+from ..cliente_async import cliente_middleware
+from ..trazas import metodo_actual, registrar_traza
+
 # Logger para debug y errores
 _logger = logging.getLogger(__name__)
 
+# Última respuesta válida de cada URL consultada por GET (por worker).
+# Se usa para servir lecturas cuando se supera el presupuesto de peticiones.
+_ultimas_respuestas = {}
+
+# Segundos durante los que, tras un fallo de /printers, la lista se sirve
+# directamente desde el inventario guardado sin volver a intentar la red
+ESPERA_SIN_CONEXION = 30
+
+# Momento (time.monotonic) hasta el que no se consulta /printers (por worker)
+_sin_conexion_hasta = {'valor': 0.0}
+
 
 class ImpresionPersonalizadaController(http.Controller):
     """
@@ -22,7 +39,227 @@ class ImpresionPersonalizadaController(http.Controller):
     - Enviar configuraciones a APIs externas  
     - Consultar middleware para obtener datos completos de impresoras
     """
-    
+
+    # Entorno de Odoo asignado por el modelo cuando se usa fuera de una petición HTTP
+    _env = None
+
+    # Fecha del inventario guardado cuando la última consulta se sirvió sin conexión a la API
+    fecha_inventario_guardado = None
+
+    # True si la última lectura (GET) no se envió por falta de presupuesto: la API no
+    # falló, por lo que no debe tratarse como una caída del middleware
+    lectura_sin_presupuesto = False
+
+    def _get_env(self):
+        """
+        Obtiene el entorno de Odoo a usar: el asignado por el modelo o el de la petición HTTP.
+
+        Returns:
+            Environment: Entorno de Odoo
+        """
+        return self._env if self._env is not None else request.env
+
+    # ==================== LÍMITE DE PETICIONES AL MIDDLEWARE ====================
+
+    def _dentro_de_presupuesto(self, metodo):
+        """
+        Consume un token del limitador de peticiones compartido de relex_api.
+
+        Args:
+            metodo (str): Método HTTP de la petición (GET usa el presupuesto de lectura)
+
+        Returns:
+            bool: True si la petición puede enviarse al middleware
+        """
+        bucket = 'lectura' if metodo.upper() == 'GET' else 'escritura'
+        return self._get_env()['relex_api.rate.limit'].sudo()._consumir(bucket)
+
+    def _enviar_peticion(self, url, metodo='GET', datos=None):
+        """
+        Envía la petición HTTP respetando el presupuesto de peticiones.
+
+        Las lecturas fuera de presupuesto se sirven desde la última respuesta válida;
+        las escrituras fuera de presupuesto no se envían.
+
+        Args:
+            url (str): URL completa a consultar
+            metodo (str): Método HTTP (GET, POST, etc.)
+            datos (dict): Datos a enviar en caso de POST
+
+        Returns:
+            dict: Respuesta de la API o None si no se pudo obtener
+        """
+        self.lectura_sin_presupuesto = False
+        if not self._dentro_de_presupuesto(metodo):
+            return self._respuesta_fuera_de_presupuesto(url, metodo)
+
+        traza = self._nueva_traza(url, metodo, datos)
+        try:
+            resultado = self._peticion_http(url, metodo, datos, traza)
+        finally:
+            self._registrar_traza(traza)
+
+        if metodo.upper() == 'GET':
+            _ultimas_respuestas[url] = resultado
+        return resultado
+
+    def _respuesta_fuera_de_presupuesto(self, url, metodo):
+        """
+        Obtiene la respuesta a usar cuando se agotó el presupuesto de peticiones.
+
+        En las lecturas marca lectura_sin_presupuesto para que quien llama pueda
+        distinguir el rechazo del limitador de un fallo de la red.
+
+        Args:
+            url (str): URL completa de la petición
+            metodo (str): Método HTTP
+
+        Returns:
+            dict: Última respuesta válida de la URL (solo GET) o None
+        """
+        if metodo.upper() == 'GET':
+            self.lectura_sin_presupuesto = True
+        if metodo.upper() == 'GET' and url in _ultimas_respuestas:
+            _logger.info(f"Presupuesto de lectura agotado, usando última respuesta válida de {url}")
+            return _ultimas_respuestas[url]
+        _logger.warning(f"Presupuesto de peticiones agotado, petición {metodo} a {url} no enviada")
+        return None
+
+    @staticmethod
+    def _peticion_http(url, metodo, datos, traza):
+        """
+        Realiza la petición HTTP y completa los tiempos y tamaños de la traza.
+
+        No usa el entorno de Odoo, por lo que puede ejecutarse desde el cliente concurrente.
+
+        Args:
+            url (str): URL completa a consultar
+            metodo (str): Método HTTP (GET, POST, etc.)
+            datos (dict): Datos a enviar en caso de POST
+            traza (dict): Traza de la llamada a completar
+
+        Returns:
+            dict: Respuesta de la API
+        """
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'Odoo-ImpresionPersonalizada/1.0'
+        }
+
+        inicio = time.perf_counter()
+        fin_descarga = None
+        try:
+            if metodo.upper() == 'GET':
+                response = requests.get(url, timeout=10, headers=headers)
+            elif metodo.upper() == 'POST':
+                response = requests.post(url, json=datos, timeout=10, headers=headers)
+            else:
+                raise ValueError(f"Método HTTP no soportado: {metodo}")
+            fin_descarga = time.perf_counter()
+
+            # elapsed: desde el envío hasta recibir las cabeceras (conexión, TLS y servidor)
+            traza['estado'] = str(response.status_code)
+            traza['red_ms'] = int(response.elapsed.total_seconds() * 1000)
+            traza['tamano_respuesta'] = len(response.content or b'')
+
+            response.raise_for_status()
+            resultado = response.json() if response.content else {}
+            traza['parseo_ms'] = int((time.perf_counter() - fin_descarga) * 1000)
+            return resultado
+        except Exception as e:
+            traza['estado'] = traza['estado'] or type(e).__name__
+            raise
+        finally:
+            traza['duracion_ms'] = int((time.perf_counter() - inicio) * 1000)
+            if fin_descarga is not None:
+                traza['descarga_ms'] = max(int((fin_descarga - inicio) * 1000) - traza['red_ms'], 0)
+
+    def consultar_varios(self, peticiones):
+        """
+        Realiza varias peticiones al middleware en paralelo.
+
+        El presupuesto de peticiones y las trazas se manejan en el hilo actual;
+        solo las peticiones HTTP se ejecutan de forma concurrente.
+
+        Args:
+            peticiones (list): Tuplas (endpoint_key, metodo, datos)
+
+        Returns:
+            list: Respuestas en el mismo orden que las peticiones (None si falló)
+        """
+        resultados = [None] * len(peticiones)
+        pendientes = []
+        self.lectura_sin_presupuesto = False
+        for indice, (endpoint_key, metodo, datos) in enumerate(peticiones):
+            try:
+                url = self._get_api_url(endpoint_key)
+                if not self._dentro_de_presupuesto(metodo):
+                    resultados[indice] = self._respuesta_fuera_de_presupuesto(url, metodo)
+                    continue
+                traza = self._nueva_traza(url, metodo, datos)
+                llamada = functools.partial(self._peticion_http, url, metodo, datos, traza)
+                pendientes.append((indice, url, metodo, traza, llamada))
+            except Exception as e:
+                _logger.error(f"Error al preparar petición a '{endpoint_key}': {e}")
+
+        try:
+            respuestas = cliente_middleware.ejecutar([pendiente[4] for pendiente in pendientes])
+        except Exception as e:
+            _logger.error(f"Error al ejecutar peticiones concurrentes a API externa: {e}")
+            respuestas = [e] * len(pendientes)
+
+        for (indice, url, metodo, traza, _llamada), respuesta in zip(pendientes, respuestas):
+            self._registrar_traza(traza)
+            if isinstance(respuesta, Exception):
+                _logger.error(f"Error en petición a API externa {url}: {respuesta}")
+                continue
+            if metodo.upper() == 'GET':
+                _ultimas_respuestas[url] = respuesta
+            resultados[indice] = respuesta
+        return resultados
+
+    # ==================== TRAZAS DE LLAMADAS AL MIDDLEWARE ====================
+
+    def _nueva_traza(self, url, metodo, datos=None):
+        """
+        Crea la traza de una llamada al middleware con los datos conocidos antes de enviarla.
+
+        Args:
+            url (str): URL completa de la llamada
+            metodo (str): Método HTTP
+            datos (dict): Datos enviados en caso de POST
+
+        Returns:
+            dict: Traza con los tiempos y tamaños en cero
+        """
+        return {
+            'fecha': fields.Datetime.now(),
+            'endpoint': url,
+            'metodo_http': metodo.upper(),
+            'estado': '',
+            'metodo_modelo': metodo_actual(),
+            'uid': self._get_env().uid,
+            'duracion_ms': 0,
+            'red_ms': 0,
+            'descarga_ms': 0,
+            'parseo_ms': 0,
+            'tamano_peticion': len(json.dumps(datos)) if datos else 0,
+            'tamano_respuesta': 0,
+        }
+
+    def _registrar_traza(self, traza):
+        """
+        Guarda la traza en el buffer en memoria y, si supera el umbral, en el registro de llamadas lentas.
+
+        Args:
+            traza (dict): Traza completa de la llamada
+        """
+        try:
+            registrar_traza(traza)
+            self._get_env()['impresoras.llamada.lenta']._registrar_si_lenta(traza)
+        except Exception as e:
+            _logger.error(f"Error al registrar traza de llamada a API: {e}")
+
     # ==================== MÉTODOS PARA CONSULTAR API EXTERNA ====================
 
     def _get_api_url(self, endpoint_key='printers'):
@@ -37,11 +274,11 @@ class ImpresionPersonalizadaController(http.Controller):
         """
         try:
             # Usar las constantes para construir la URL
-            return build_url(request.env,endpoint_key)
+            return build_url(self._get_env(),endpoint_key)
         except KeyError:
             _logger.error(f"Endpoint '{endpoint_key}' no encontrado en constantes")
             # Fallback a URL de impresoras por defecto
-            return build_url(request.env,'printers')
+            return build_url(self._get_env(),'printers')
         except Exception as e:
             _logger.error(f"Error al construir URL de API: {e}")
             # Último recurso: usar API_BASE_URL directamente
@@ -62,20 +299,7 @@ class ImpresionPersonalizadaController(http.Controller):
         try:
             url = self._get_api_url(endpoint_key)
 
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'Odoo-ImpresionPersonalizada/1.0'
-            }
-
-            if metodo.upper() == 'GET':
-                response = requests.get(url, timeout=10, headers=headers)
-            elif metodo.upper() == 'POST':
-                response = requests.post(url, json=datos, timeout=10, headers=headers)
-            else:
-                raise ValueError(f"Método HTTP no soportado: {metodo}")
-
-            response.raise_for_status()
-            return response.json() if response.content else {}
+            return self._enviar_peticion(url, metodo, datos)
 
         except requests.exceptions.RequestException as e:
             _logger.error(f"Error en petición a API externa: {e}")
@@ -106,20 +330,7 @@ class ImpresionPersonalizadaController(http.Controller):
 
             url = url_base + endpoint
 
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'Odoo-ImpresionPersonalizada/1.0'
-            }
-
-            if metodo.upper() == 'GET':
-                response = requests.get(url, timeout=10, headers=headers)
-            elif metodo.upper() == 'POST':
-                response = requests.post(url, json=datos, timeout=10, headers=headers)
-            else:
-                raise ValueError(f"Método HTTP no soportado: {metodo}")
-
-            response.raise_for_status()
-            return response.json() if response.content else {}
+            return self._enviar_peticion(url, metodo, datos)
 
         except requests.exceptions.RequestException as e:
             _logger.error(f"Error en petición a API externa: {e}")
@@ -128,18 +339,68 @@ class ImpresionPersonalizadaController(http.Controller):
             _logger.error(f"Error inesperado en API externa: {e}")
             return None
 
-    def consultar_impresoras_api_externa(self):
+    def consultar_impresoras_api_externa(self, forzar=False, impresora_predeterminada=None):
         """
         Consulta la API externa para obtener la lista de impresoras disponibles usando constantes.
 
+        Si la API no responde, devuelve la última lista guardada y deja su fecha en
+        fecha_inventario_guardado para indicar que los datos están desactualizados.
+        Tras un fallo, durante ESPERA_SIN_CONEXION segundos la lista se sirve
+        directamente desde el inventario guardado, sin esperar el timeout de la red.
+        Una lectura rechazada por el limitador de peticiones no es un fallo de la
+        API: se sirve el inventario guardado sin marcarlo como sin conexión y sin
+        iniciar la espera.
+
+        Args:
+            forzar (bool): Consultar la red aunque se esté dentro de la espera sin
+                conexión (refresco manual, para comprobar si la API volvió)
+            impresora_predeterminada (dict): Datos de la predeterminada a reenviar al
+                middleware en paralelo con la consulta (refresco manual)
+
         Returns:
             list: Lista de diccionarios con información de impresoras o lista vacía en caso de error
         """
         try:
             _logger.info(f"Consultando API de impresoras usando constantes")
+            self.fecha_inventario_guardado = None
+            self.lectura_sin_presupuesto = False
+            snapshots = self._get_env()['impresoras.inventario.snapshot']
 
-            # Usar el método centralizado con constantes
-            impresoras_data = self._consultar_api_externa('printers')
+            if not forzar and time.monotonic() < _sin_conexion_hasta['valor']:
+                # Fallo reciente: no volver a intentar la red hasta que pase la espera
+                impresoras_data = None
+            else:
+                if impresora_predeterminada:
+                    # Lista y predeterminada en paralelo: el refresco tarda un solo viaje de ida y vuelta
+                    impresoras_data, respuesta = self.consultar_varios([
+                        ('printers', 'GET', None),
+                        ('default_printer', 'POST', self._datos_predeterminada(impresora_predeterminada)),
+                    ])
+                    if respuesta is None:
+                        _logger.warning("No se pudo reenviar la impresora predeterminada durante el refresco")
+                else:
+                    # Usar el método centralizado con constantes
+                    impresoras_data = self._consultar_api_externa('printers')
+                if self.lectura_sin_presupuesto:
+                    # Rechazada por el limitador, no por la red: no iniciar la espera sin conexión
+                    pass
+                elif impresoras_data is None:
+                    _sin_conexion_hasta['valor'] = time.monotonic() + ESPERA_SIN_CONEXION
+                else:
+                    _sin_conexion_hasta['valor'] = 0.0
+
+            if impresoras_data is None:
+                # Sin conexión o sin presupuesto: servir la última lista conocida
+                impresoras_data, fecha = snapshots.obtener_ultimo()
+                if impresoras_data:
+                    if self.lectura_sin_presupuesto:
+                        _logger.info(f"Presupuesto de lectura agotado, usando inventario guardado del {fecha}")
+                    else:
+                        self.fecha_inventario_guardado = fecha
+                        _logger.warning(f"API sin conexión, usando inventario guardado del {fecha}")
+                    return impresoras_data
+            elif impresoras_data:
+                snapshots._guardar_snapshot(impresoras_data)
 
             if impresoras_data:
                 _logger.info(f"Se obtuvieron {len(impresoras_data)} impresoras de la API externa")
@@ -180,19 +441,23 @@ class ImpresionPersonalizadaController(http.Controller):
             _logger.error(f"Error inesperado al obtener impresoras: {e}")
             return []
 
-    def get_impresoras_para_selection(self):
+    def get_impresoras_para_selection(self, impresoras_data=None):
         """
         Obtiene la lista de impresoras formateada para campos Selection de Odoo usando constantes.
 
+        Args:
+            impresoras_data (list): Lista ya obtenida de la API (si no se indica, se consulta)
+
         Returns:
             list: Lista de tuplas (valor, etiqueta) para el campo Selection
         """
         try:
-            # Consultar API externa usando constantes
-            impresoras_data = self.consultar_impresoras_api_externa()
+            # Consultar API externa usando constantes, salvo que ya se tengan los datos
+            if impresoras_data is None:
+                impresoras_data = self.consultar_impresoras_api_externa()
 
             if not impresoras_data:
-                url_cfg = request.env['ir.config_parameter'].sudo().get_param('relex_api.api_base_url')
+                url_cfg = self._get_env()['ir.config_parameter'].sudo().get_param('relex_api.api_base_url')
                 return [('sin_conexion', f'Sin conexión a API - Verificar {url_cfg or "URL no configurada"}')]
 
             # Convertir a formato Selection de Odoo
@@ -203,6 +468,9 @@ class ImpresionPersonalizadaController(http.Controller):
                 puerto = impresora.get('port', '')  # Tu API usa 'port'
                 # Crear descripción combinando nombre y puerto
                 descripcion = f"{nombre} ({puerto})" if puerto else nombre
+                if self.fecha_inventario_guardado:
+                    # Marcar que la lista proviene del inventario guardado
+                    descripcion = f"{descripcion} - sin conexión"
                 impresoras_list.append((nombre, descripcion))
 
             _logger.info(f"Se formatearon {len(impresoras_list)} impresoras para Selection")
@@ -247,6 +515,23 @@ class ImpresionPersonalizadaController(http.Controller):
             _logger.error(f"Error al formatear impresoras para Selection con URL {url_especifica}: {e}")
             return [('error', f'Error al consultar {url_especifica}')]
 
+    def _datos_predeterminada(self, impresora_data):
+        """
+        Prepara los datos de la impresora predeterminada en el formato del middleware.
+
+        Args:
+            impresora_data (dict): Datos de la impresora (name, direccion_ip, puerto)
+
+        Returns:
+            dict: Datos a enviar a /impresora/predeterminada
+        """
+        return {
+            'nombre': impresora_data.get('name'),
+            'ip': impresora_data.get('direccion_ip'),
+            'puerto': impresora_data.get('puerto'),
+            'timestamp': self._get_env().cr.now().isoformat()
+        }
+
     def enviar_predeterminada_api_externa(self, impresora_data):
         """
         Envía la configuración de impresora predeterminada a la API externa usando constantes.
@@ -261,12 +546,7 @@ class ImpresionPersonalizadaController(http.Controller):
             _logger.info(f"Enviando impresora predeterminada a API externa")
 
             # Preparar datos para envío
-            datos_envio = {
-                'nombre': impresora_data.get('name'),
-                'ip': impresora_data.get('direccion_ip'),
-                'puerto': impresora_data.get('puerto'),
-                'timestamp': request.env.cr.now().isoformat()
-            }
+            datos_envio = self._datos_predeterminada(impresora_data)
             
             # Enviar usando constantes
             respuesta = self._consultar_api_externa('default_printer', 'POST', datos_envio)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Herramientas para migraciones y cargas masivas de datos del módulo impresoras.
+
+Procesa tablas grandes por rangos de id con una sentencia SQL por lote,
+confirmando entre lotes y guardando un punto de control para poder retomar
+el proceso si se interrumpe (por ejemplo, al agotarse la ventana de mantenimiento).
+"""
+
+import logging
+import time
+
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Cantidad de ids procesados por lote
+TAMANO_LOTE = 10000
+
+# Prefijo de los parámetros del sistema donde se guardan los puntos de control
+PREFIJO_CHECKPOINT = 'impresoras.migracion.'
+
+
+def _leer_checkpoint(cr, nombre):
+    """
+    Lee el último id procesado de un proceso por lotes.
+
+    Args:
+        cr: Cursor de base de datos
+        nombre (str): Nombre del proceso
+
+    Returns:
+        int: Último id procesado (0 si el proceso no comenzó)
+    """
+    cr.execute("SELECT value FROM ir_config_parameter WHERE key = %s", [PREFIJO_CHECKPOINT + nombre])
+    fila = cr.fetchone()
+    return int(fila[0]) if fila else 0
+
+
+def _guardar_checkpoint(cr, nombre, ultimo_id):
+    """
+    Guarda el último id procesado de un proceso por lotes.
+
+    Args:
+        cr: Cursor de base de datos
+        nombre (str): Nombre del proceso
+        ultimo_id (int): Último id procesado
+    """
+    cr.execute("""
+        INSERT INTO ir_config_parameter (key, value, create_uid, create_date, write_uid, write_date)
+        VALUES (%s, %s, 1, now() at time zone 'UTC', 1, now() at time zone 'UTC')
+        ON CONFLICT (key) DO UPDATE
+           SET value = EXCLUDED.value, write_date = EXCLUDED.write_date
+    """, [PREFIJO_CHECKPOINT + nombre, str(ultimo_id)])
+
+
+def _borrar_checkpoint(cr, nombre):
+    """
+    Elimina el punto de control de un proceso terminado.
+
+    Args:
+        cr: Cursor de base de datos
+        nombre (str): Nombre del proceso
+    """
+    cr.execute("DELETE FROM ir_config_parameter WHERE key = %s", [PREFIJO_CHECKPOINT + nombre])
+
+
+def procesar_por_lotes(cr, nombre, tabla, sentencia, params=None, tamano_lote=TAMANO_LOTE, commit=True):
+    """
+    Ejecuta una sentencia SQL sobre una tabla por rangos de id.
+
+    La sentencia recibe los parámetros %(desde)s y %(hasta)s y debe limitarse a
+    las filas con desde < id <= hasta. Debe ser idempotente: si el proceso se
+    interrumpe, se retoma desde el último lote confirmado.
+
+    Ejemplo:
+        procesar_por_lotes(cr, 'puerto_default', 'impresoras', '''
+            UPDATE impresoras SET puerto = '9100'
+             WHERE id > %(desde)s AND id <= %(hasta)s AND puerto IS NULL
+        ''')
+
+    Args:
+        cr: Cursor de base de datos
+        nombre (str): Nombre del proceso (identifica su punto de control)
+        tabla (str): Tabla a recorrer
+        sentencia (str): Sentencia SQL a ejecutar por lote
+        params (dict): Parámetros adicionales de la sentencia
+        tamano_lote (int): Cantidad de ids por lote
+        commit (bool): Confirmar la transacción después de cada lote
+
+    Returns:
+        int: Cantidad total de filas afectadas
+    """
+    cr.execute(SQL("SELECT max(id) FROM %s", SQL.identifier(tabla)))
+    maximo = cr.fetchone()[0] or 0
+
+    desde = _leer_checkpoint(cr, nombre)
+    if desde:
+        _logger.info(f"Migración '{nombre}': retomando desde id {desde}")
+
+    total = 0
+    inicio = time.perf_counter()
+    while desde < maximo:
+        hasta = min(desde + tamano_lote, maximo)
+        cr.execute(sentencia, dict(params or {}, desde=desde, hasta=hasta))
+        total += max(cr.rowcount, 0)
+        _guardar_checkpoint(cr, nombre, hasta)
+        if commit:
+            cr.commit()
+        _logger.info(f"Migración '{nombre}': ids {desde + 1}-{hasta} de {maximo} procesados")
+        desde = hasta
+
+    _borrar_checkpoint(cr, nombre)
+    if commit:
+        cr.commit()
+    _logger.info(f"Migración '{nombre}' terminada: {total} filas en {time.perf_counter() - inicio:.1f}s")
+    return total
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+# Corrección masiva de impresoras predeterminadas al actualizar a 18.0.1.1.0.
+# Se conserva como predeterminada solo la modificada más recientemente; el resto
+# se desmarca por lotes de ids con SQL, sin pasar por el ORM registro por registro.
+
+import logging
+
+from odoo.addons.impresoras.migracion import procesar_por_lotes
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    Punto de entrada de la migración.
+
+    Args:
+        cr: Cursor de base de datos
+        version (str): Versión instalada antes de la actualización
+    """
+    if not version:
+        return
+
+    cr.execute("""
+        SELECT id FROM impresoras
+         WHERE es_predeterminada
+         ORDER BY write_date DESC NULLS LAST, id DESC
+         LIMIT 1
+    """)
+    fila = cr.fetchone()
+    if not fila:
+        return
+
+    corregidas = procesar_por_lotes(cr, 'predeterminada_unica', 'impresoras', """
+        UPDATE impresoras
+           SET es_predeterminada = false
+         WHERE id > %(desde)s AND id <= %(hasta)s
+           AND es_predeterminada
+           AND id != %(mantener)s
+    """, params={'mantener': fila[0]})
+    _logger.info(f"Impresoras predeterminadas corregidas: {corregidas} (se mantuvo id {fila[0]})")
@@ -1,3 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from . import models
+from . import documento_cache
+from . import trabajo
+from . import inventario_snapshot
+from . import llamada_lenta
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+# Importaciones necesarias de Odoo y Python
+from odoo import models, fields, api
+import base64
+import hashlib
+import logging
+
+import psycopg2
+
+# Logger para debug y errores
+_logger = logging.getLogger(__name__)
+
+# Tamaño máximo por defecto de la caché de documentos (en MB)
+CACHE_MAX_MB_DEFAULT = 256
+
+
+class ImpresorasDocumentoCache(models.Model):
+    """
+    Caché de documentos renderizados para reimpresiones.
+
+    Cada entrada se identifica por una clave derivada del reporte, el registro,
+    su write_date y el contexto de renderizado (idioma, compañías y grupos del
+    usuario): si el registro cambia, la clave cambia y la entrada antigua
+    deja de usarse hasta que el desalojo LRU la elimine.
+    El contenido se guarda como adjunto (filestore), no en la tabla.
+    """
+
+    # ==================== CONFIGURACIÓN DEL MODELO ====================
+
+    _name = "impresoras.documento.cache"
+    _description = "Caché de documentos renderizados"
+    _order = "ultimo_acceso desc, id desc"
+
+    _sql_constraints = [
+        ('clave_unica', 'unique(clave)', 'Ya existe una entrada de caché para esta clave.'),
+    ]
+
+    # ==================== DEFINICIÓN DE CAMPOS ====================
+
+    # Clave de contenido (sha256 de reporte + modelo + id + write_date + contexto)
+    clave = fields.Char(string='Clave', required=True, index=True, readonly=True)
+
+    # Datos de origen del documento
+    report_name = fields.Char(string='Reporte', required=True, readonly=True)
+    res_model = fields.Char(string='Modelo', required=True, readonly=True)
+    res_id = fields.Integer(string='ID Registro', required=True, readonly=True)
+    fecha_registro = fields.Datetime(string='Modificación del Registro', readonly=True)
+
+    # Contenido renderizado, almacenado como adjunto en disco
+    payload = fields.Binary(string='Documento', attachment=True, readonly=True)
+    formato = fields.Char(string='Formato', readonly=True)
+    tamano = fields.Integer(string='Tamaño (bytes)', readonly=True)
+
+    # Datos para el desalojo LRU
+    ultimo_acceso = fields.Datetime(string='Último Acceso', index=True, readonly=True)
+    accesos = fields.Integer(string='Accesos', default=0, readonly=True)
+
+    # ==================== MÉTODOS DE CACHÉ ====================
+
+    @api.model
+    def _calcular_clave(self, report_name, record):
+        """
+        Calcula la clave de contenido de un documento.
+
+        Además del registro y su write_date (con microsegundos), la clave incluye
+        el contexto de renderizado: idioma, compañías y grupos del usuario, para
+        no servir a un usuario un documento renderizado con otro contexto o permisos.
+
+        Args:
+            report_name (str): Nombre técnico del reporte
+            record (recordset): Registro a imprimir (un solo registro)
+
+        Returns:
+            str: Hash sha256 en hexadecimal
+        """
+        write_date = record.write_date.isoformat() if record.write_date else ''
+        idioma = self.env.lang or ''
+        companias = ','.join(str(cid) for cid in [self.env.company.id] + sorted(self.env.companies.ids))
+        grupos = 'su' if self.env.su else ','.join(str(gid) for gid in sorted(self.env.user.groups_id.ids))
+        origen = f"{report_name}|{record._name}|{record.id}|{write_date}|{idioma}|{companias}|{grupos}"
+        return hashlib.sha256(origen.encode('utf-8')).hexdigest()
+
+    @api.model
+    def obtener_documento(self, report_ref, record):
+        """
+        Devuelve el documento renderizado de un registro, usando la caché si es posible.
+
+        Una reimpresión del mismo registro sin cambios se sirve desde la caché
+        sin volver a renderizar el reporte.
+
+        Args:
+            report_ref (str): xmlid o nombre técnico del reporte
+            record (recordset): Registro a imprimir (un solo registro)
+
+        Returns:
+            tuple: (contenido en bytes, formato del reporte)
+        """
+        record.ensure_one()
+        report = self.env['ir.actions.report']._get_report(report_ref)
+        clave = self._calcular_clave(report.report_name, record)
+
+        cache = self.sudo()
+        entrada = cache.search([('clave', '=', clave)], limit=1)
+        if entrada:
+            entrada.write({
+                'ultimo_acceso': fields.Datetime.now(),
+                'accesos': entrada.accesos + 1,
+            })
+            _logger.info(f"Documento servido desde caché: {report.report_name} {record._name}({record.id})")
+            return base64.b64decode(entrada.payload), entrada.formato
+
+        # No hay entrada: renderizar y guardar
+        contenido, formato = report._render(report.report_name, record.ids)
+        if isinstance(contenido, str):
+            contenido = contenido.encode('utf-8')
+
+        try:
+            with self.env.cr.savepoint():
+                cache.create({
+                    'clave': clave,
+                    'report_name': report.report_name,
+                    'res_model': record._name,
+                    'res_id': record.id,
+                    'fecha_registro': record.write_date,
+                    'payload': base64.b64encode(contenido),
+                    'formato': formato,
+                    'tamano': len(contenido),
+                    'ultimo_acceso': fields.Datetime.now(),
+                    'accesos': 1,
+                })
+        except psycopg2.IntegrityError:
+            # Otro proceso guardó la misma clave en paralelo; el contenido es equivalente
+            _logger.info(f"Entrada de caché ya creada por otro proceso: {clave}")
+
+        cache._desalojar()
+        return contenido, formato
+
+    @api.model
+    def _get_tamano_maximo(self):
+        """
+        Obtiene el tamaño máximo de la caché desde los parámetros del sistema.
+
+        Returns:
+            int: Tamaño máximo en bytes
+        """
+        valor = self.env['ir.config_parameter'].sudo().get_param(
+            'impresoras.cache_documentos_max_mb', CACHE_MAX_MB_DEFAULT)
+        try:
+            return int(valor) * 1024 * 1024
+        except (TypeError, ValueError):
+            return CACHE_MAX_MB_DEFAULT * 1024 * 1024
+
+    @api.model
+    def _desalojar(self):
+        """
+        Elimina las entradas menos usadas recientemente hasta respetar el tamaño máximo.
+
+        Returns:
+            int: Cantidad de entradas eliminadas
+        """
+        self.flush_model(['tamano', 'ultimo_acceso'])
+        # Suma acumulada de tamaños desde la más reciente: todo lo que exceda el
+        # límite se elimina en un solo unlink
+        self.env.cr.execute("""
+            SELECT id FROM (
+                SELECT id, SUM(tamano) OVER (ORDER BY ultimo_acceso DESC NULLS LAST, id DESC) AS acumulado
+                  FROM impresoras_documento_cache
+            ) entradas
+             WHERE acumulado > %s
+        """, [self._get_tamano_maximo()])
+        ids = [fila[0] for fila in self.env.cr.fetchall()]
+        if ids:
+            self.sudo().browse(ids).unlink()
+            _logger.info(f"Caché de documentos: {len(ids)} entradas desalojadas")
+        return len(ids)
+
+    @api.autovacuum
+    def _gc_documentos_cache(self):
+        """
+        Limpieza periódica de la caché (ejecutada por el autovacuum de Odoo).
+        """
+        self._desalojar()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+# Importaciones necesarias de Odoo y Python
+from odoo import models, fields, api
+import hashlib
+import json
+import logging
+
+import psycopg2
+
+# Logger para debug y errores
+_logger = logging.getLogger(__name__)
+
+# Cantidad de versiones del inventario que se conservan por defecto
+SNAPSHOTS_MAX_DEFAULT = 10
+
+
+class ImpresorasInventarioSnapshot(models.Model):
+    """
+    Última lista de impresoras conocida, obtenida desde la API.
+
+    Cada respuesta válida de /printers que difiere de la anterior se guarda como
+    una nueva versión en formato JSON compacto. Cuando la API no responde, la
+    lista se sirve desde la última versión y se marca como desactualizada.
+    """
+
+    # ==================== CONFIGURACIÓN DEL MODELO ====================
+
+    _name = "impresoras.inventario.snapshot"
+    _description = "Inventario de impresoras guardado"
+    _order = "version desc"
+    _log_access = False
+
+    _sql_constraints = [
+        ('version_unica', 'unique(version)', 'La versión del inventario debe ser única.'),
+    ]
+
+    # ==================== DEFINICIÓN DE CAMPOS ====================
+
+    # Número de versión correlativo (indexado por la restricción de unicidad)
+    version = fields.Integer(string='Versión', required=True, readonly=True)
+
+    # Fecha en que se obtuvo el inventario desde la API
+    fecha = fields.Datetime(string='Fecha', required=True, readonly=True)
+
+    # Respuesta de /printers en JSON compacto y su huella
+    datos = fields.Text(string='Datos', required=True, readonly=True)
+    huella = fields.Char(string='Huella', required=True, readonly=True)
+
+    # Cantidad de impresoras en la versión
+    cantidad = fields.Integer(string='Impresoras', readonly=True)
+
+    # ==================== MÉTODOS DEL INVENTARIO ====================
+
+    @api.model
+    def _guardar_snapshot(self, impresoras_data):
+        """
+        Guarda el inventario recibido de la API si cambió respecto de la última versión.
+
+        Se compara contra la huella de la última versión en la base de datos (no
+        contra un valor en memoria del worker), para que la última versión sea
+        siempre la última respuesta recibida por cualquier worker.
+        Se usa un cursor propio: la lista se consulta desde fields_get, que puede
+        ejecutarse en transacciones de solo lectura.
+
+        Args:
+            impresoras_data (list): Respuesta de /printers
+        """
+        datos = json.dumps(impresoras_data, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+        huella = hashlib.sha1(datos.encode('utf-8')).hexdigest()
+
+        try:
+            with self.env.registry.cursor() as cr:
+                cr.execute("""
+                    SELECT version, huella FROM impresoras_inventario_snapshot
+                     ORDER BY version DESC
+                     LIMIT 1
+                """)
+                ultimo = cr.fetchone()
+                if ultimo and ultimo[1] == huella:
+                    return
+                version = (ultimo[0] if ultimo else 0) + 1
+                snapshots = self.with_env(self.env(cr=cr, su=True))
+                snapshots.create({
+                    'version': version,
+                    'fecha': fields.Datetime.now(),
+                    'datos': datos,
+                    'huella': huella,
+                    'cantidad': len(impresoras_data),
+                })
+                snapshots._limitar_historial()
+            _logger.info(f"Inventario de impresoras guardado: versión {version}")
+        except psycopg2.IntegrityError:
+            # Otro worker guardó la misma versión en paralelo; la próxima respuesta se compara de nuevo
+            _logger.info("Inventario de impresoras guardado en paralelo por otro proceso")
+        except Exception as e:
+            _logger.error(f"Error al guardar el inventario de impresoras: {e}")
+
+    @api.model
+    def _limitar_historial(self):
+        """
+        Elimina las versiones más antiguas que exceden el historial configurado.
+        """
+        valor = self.env['ir.config_parameter'].sudo().get_param(
+            'impresoras.snapshots_max', SNAPSHOTS_MAX_DEFAULT)
+        try:
+            maximo = max(int(valor), 1)
+        except (TypeError, ValueError):
+            maximo = SNAPSHOTS_MAX_DEFAULT
+        self.flush_model()
+        self.env.cr.execute("""
+            DELETE FROM impresoras_inventario_snapshot
+             WHERE id IN (
+                SELECT id FROM impresoras_inventario_snapshot
+                 ORDER BY version DESC
+                OFFSET %s
+             )
+        """, [maximo])
+        if self.env.cr.rowcount:
+            self.invalidate_model()
+
+    @api.model
+    def obtener_ultimo(self):
+        """
+        Obtiene la última versión guardada del inventario.
+
+        Returns:
+            tuple: (lista de impresoras, fecha de la versión) o (None, None) si no hay ninguna
+        """
+        ultimo = self.sudo().search([], limit=1)
+        if not ultimo:
+            return None, None
+        return json.loads(ultimo.datos), ultimo.fecha
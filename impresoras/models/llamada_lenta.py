@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+# Importaciones necesarias de Odoo y Python
+from odoo import models, fields, api
+from odoo.exceptions import AccessError
+import logging
+
+from ..trazas import ultimas_trazas
+
+# Logger para debug y errores
+_logger = logging.getLogger(__name__)
+
+# Umbral por defecto a partir del cual una llamada se considera lenta (ms)
+UMBRAL_LENTA_MS_DEFAULT = 1000
+
+
+class ImpresorasLlamadaLenta(models.Model):
+    """
+    Registro de llamadas lentas al middleware de impresoras.
+
+    Las llamadas que superan el umbral configurado se guardan con sus tiempos,
+    el endpoint y el método del modelo y usuario que las originaron.
+    """
+
+    # ==================== CONFIGURACIÓN DEL MODELO ====================
+
+    _name = "impresoras.llamada.lenta"
+    _description = "Llamada lenta al middleware"
+    _order = "fecha desc, id desc"
+    _log_access = False
+
+    # ==================== DEFINICIÓN DE CAMPOS ====================
+
+    fecha = fields.Datetime(string='Fecha', required=True, index=True, readonly=True)
+    endpoint = fields.Char(string='Endpoint', readonly=True)
+    metodo_http = fields.Char(string='Método HTTP', readonly=True)
+    estado = fields.Char(string='Estado', readonly=True)
+
+    # Origen de la llamada
+    metodo_modelo = fields.Char(string='Método del Modelo', readonly=True)
+    user_id = fields.Many2one('res.users', string='Usuario', readonly=True, ondelete='set null')
+
+    # Tiempos de la llamada (ms)
+    duracion_ms = fields.Integer(string='Total (ms)', readonly=True)
+    red_ms = fields.Integer(string='Red hasta cabeceras (ms)', readonly=True,
+                            help="Conexión, TLS y procesamiento del servidor hasta recibir las cabeceras")
+    descarga_ms = fields.Integer(string='Descarga (ms)', readonly=True)
+    parseo_ms = fields.Integer(string='Parseo (ms)', readonly=True)
+
+    # Tamaños de la petición y la respuesta (bytes)
+    tamano_peticion = fields.Integer(string='Tamaño Petición', readonly=True)
+    tamano_respuesta = fields.Integer(string='Tamaño Respuesta', readonly=True)
+
+    # ==================== MÉTODOS DE REGISTRO ====================
+
+    @api.model
+    def _get_umbral_ms(self):
+        """
+        Obtiene el umbral de llamada lenta desde los parámetros del sistema.
+
+        Returns:
+            int: Umbral en milisegundos
+        """
+        valor = self.env['ir.config_parameter'].sudo().get_param(
+            'impresoras.umbral_llamada_lenta_ms', UMBRAL_LENTA_MS_DEFAULT)
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            return UMBRAL_LENTA_MS_DEFAULT
+
+    @api.model
+    def _registrar_si_lenta(self, traza):
+        """
+        Guarda la traza si su duración supera el umbral configurado.
+
+        Se usa un cursor propio para que el registro se conserve aunque la
+        transacción del usuario falle o sea de solo lectura.
+
+        Args:
+            traza (dict): Traza de la llamada generada por el controlador
+        """
+        if traza['duracion_ms'] < self._get_umbral_ms():
+            return
+        try:
+            with self.env.registry.cursor() as cr:
+                self.with_env(self.env(cr=cr, su=True)).create({
+                    'fecha': traza['fecha'],
+                    'endpoint': traza['endpoint'],
+                    'metodo_http': traza['metodo_http'],
+                    'estado': traza['estado'],
+                    'metodo_modelo': traza['metodo_modelo'],
+                    'user_id': traza['uid'],
+                    'duracion_ms': traza['duracion_ms'],
+                    'red_ms': traza['red_ms'],
+                    'descarga_ms': traza['descarga_ms'],
+                    'parseo_ms': traza['parseo_ms'],
+                    'tamano_peticion': traza['tamano_peticion'],
+                    'tamano_respuesta': traza['tamano_respuesta'],
+                })
+        except Exception as e:
+            _logger.error(f"Error al registrar llamada lenta: {e}")
+
+    @api.model
+    def obtener_trazas_recientes(self, limite=100):
+        """
+        Devuelve las últimas llamadas al middleware registradas en este worker.
+
+        Args:
+            limite (int): Cantidad máxima de trazas
+
+        Returns:
+            list: Trazas de la más reciente a la más antigua
+
+        Raises:
+            AccessError: Si el usuario no es administrador (las trazas incluyen a todos los usuarios)
+        """
+        if not self.env.is_system():
+            raise AccessError("Solo los administradores pueden consultar las trazas de llamadas a la API.")
+        return ultimas_trazas(limite)
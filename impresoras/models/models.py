@@ -4,9 +4,30 @@
 from odoo import models, fields, api
 import logging
 
+from ..trazas import trazar_metodo
+
 # Logger para debug y errores
 _logger = logging.getLogger(__name__)
 
+# Canal y tipo de notificación del bus para los cambios de estado de las impresoras
+CANAL_ESTADO = 'impresoras_estado'
+NOTIFICACION_ESTADO = 'impresoras/estado'
+
+# Equivalencias entre los estados informados por el middleware y los del campo estado_api
+ESTADOS_MIDDLEWARE = {
+    'online': 'en_linea',
+    'ready': 'en_linea',
+    'idle': 'en_linea',
+    'printing': 'en_linea',
+    'en_linea': 'en_linea',
+    'paper_out': 'sin_papel',
+    'out_of_paper': 'sin_papel',
+    'sin_papel': 'sin_papel',
+    'offline': 'fuera_de_linea',
+    'error': 'fuera_de_linea',
+    'fuera_de_linea': 'fuera_de_linea',
+}
+
 
 class Impresoras(models.Model):
     """
@@ -60,6 +81,27 @@ class Impresoras(models.Model):
         default=False,
         help="Marca esta impresora como la predeterminada del sistema"
     )
+
+    # Estado informado por el middleware (actualizado por el sondeo periódico)
+    estado_api = fields.Selection(
+        [
+            ('en_linea', 'En línea'),
+            ('sin_papel', 'Sin papel'),
+            ('fuera_de_linea', 'Fuera de línea'),
+            ('desconocido', 'Desconocido'),
+        ],
+        string='Estado',
+        default='desconocido',
+        readonly=True,
+        help="Estado de la impresora según el middleware, actualizado automáticamente"
+    )
+
+    # Cantidad de trabajos pendientes en la cola de la impresora
+    trabajos_en_cola = fields.Integer(
+        string='Trabajos en Cola',
+        readonly=True,
+        help="Trabajos pendientes en la cola de la impresora según el middleware"
+    )
     
 
     # ==================== MÉTODOS DE INTEGRACIÓN CON CONTROLADOR ====================
@@ -73,11 +115,15 @@ class Impresoras(models.Model):
         """
         try:
             from ..controllers.controllers import ImpresionPersonalizadaController
-            return ImpresionPersonalizadaController()
+            controller = ImpresionPersonalizadaController()
+            # Usar el entorno del modelo (también fuera de peticiones HTTP, ej. cron)
+            controller._env = self.env
+            return controller
         except ImportError:
             _logger.error("No se pudo importar el controlador de impresión personalizada")
             raise
     
+    @trazar_metodo
     def _get_impresoras_disponibles(self):
         """
         Obtiene la lista de impresoras disponibles desde la API externa usando constantes.
@@ -99,6 +145,7 @@ class Impresoras(models.Model):
                 ('error', 'Error al consultar impresoras - Use "Refrescar Lista API"'),
             ]
 
+    @trazar_metodo
     def consultar_impresoras_api(self):
         """
         Método para refrescar manualmente la lista de impresoras desde la API usando constantes.
@@ -113,12 +160,42 @@ class Impresoras(models.Model):
 
             _logger.info("Refrescando lista de impresoras usando constantes de relex_api")
 
-            # Consultar la API usando constantes
-            impresoras_data = controller.consultar_impresoras_api_externa()
-
-            if impresoras_data:
-                # Forzar recarga del campo Selection
-                self._fields['impresora_seleccionada'].selection = self._get_impresoras_disponibles()
+            # Consultar la API usando constantes y reenviar en paralelo la predeterminada,
+            # para que el middleware quede sincronizado (ej. tras un reinicio)
+            predeterminada = self.obtener_impresora_predeterminada()
+            impresora_predeterminada = {
+                'name': predeterminada.name,
+                'direccion_ip': predeterminada.direccion_ip,
+                'puerto': predeterminada.puerto,
+            } if predeterminada else None
+            # forzar: el botón siempre intenta la red, aunque haya fallado hace poco
+            impresoras_data = controller.consultar_impresoras_api_externa(
+                forzar=True, impresora_predeterminada=impresora_predeterminada)
+
+            if controller.lectura_sin_presupuesto:
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'title': 'Límite de consultas',
+                        'message': 'Se alcanzó el límite de consultas a la API - Intente nuevamente en unos segundos',
+                        'type': 'warning',
+                    }
+                }
+            elif impresoras_data and controller.fecha_inventario_guardado:
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'title': 'Sin conexión',
+                        'message': f'No se pudo conectar con la API - Se muestran {len(impresoras_data)} impresoras '
+                                   f'de la lista guardada el {controller.fecha_inventario_guardado}',
+                        'type': 'warning',
+                    }
+                }
+            elif impresoras_data:
+                # Forzar recarga del campo Selection (con los datos ya obtenidos, sin otra consulta)
+                self._fields['impresora_seleccionada'].selection = controller.get_impresoras_para_selection(impresoras_data)
                 
                 return {
                     'type': 'ir.actions.client',
@@ -153,6 +230,7 @@ class Impresoras(models.Model):
             }
     
     @api.onchange('impresora_seleccionada')
+    @trazar_metodo
     def _onchange_impresora_seleccionada(self):
         """
         Cuando se selecciona una impresora desde la API, obtener automáticamente
@@ -218,6 +296,7 @@ class Impresoras(models.Model):
 
     # ==================== MÉTODOS AUTOMÁTICOS ====================
 
+    @trazar_metodo
     def _enviar_predeterminada_automatico(self):
         """
         Envía automáticamente la configuración cuando se marca una impresora como predeterminada.
@@ -253,7 +332,7 @@ class Impresoras(models.Model):
             # Buscar otras impresoras marcadas como predeterminadas
             otras_predeterminadas = self.search([
                 ('es_predeterminada', '=', True),
-                ('id', '!=', self.id)
+                ('id', 'not in', self.ids)
             ])
             # Desmarcarlas
             if otras_predeterminadas:
@@ -263,7 +342,8 @@ class Impresoras(models.Model):
         result = super().write(vals)
 
         # Si se marcó como predeterminada, enviar a API automáticamente
-        if vals.get('es_predeterminada'):
+        # (salvo que quien escribe haga el envío él mismo, ej. establecer_como_predeterminada)
+        if vals.get('es_predeterminada') and not self.env.context.get('impresoras_sin_envio_automatico'):
             self._enviar_predeterminada_automatico()
 
         return result
@@ -288,6 +368,96 @@ class Impresoras(models.Model):
                     }
                 }
 
+    # ==================== SONDEO DE ESTADO ====================
+
+    @api.model
+    def _leer_estado_middleware(self, impresora):
+        """
+        Convierte una entrada de /printers en el par (estado, cola) del modelo.
+
+        Args:
+            impresora (dict): Entrada de la respuesta del middleware
+
+        Returns:
+            tuple: (estado_api, trabajos_en_cola)
+        """
+        estado = str(impresora.get('status') or '').lower()
+        cola = impresora.get('queue', impresora.get('queue_depth', impresora.get('jobs', 0)))
+        try:
+            cola = int(cola or 0)
+        except (TypeError, ValueError):
+            cola = 0
+        return ESTADOS_MIDDLEWARE.get(estado, 'desconocido'), cola
+
+    @api.model
+    @trazar_metodo
+    def _cron_sondear_estado(self):
+        """
+        Consulta el estado de las impresoras en el middleware y publica solo los cambios.
+
+        Se hace una consulta a /printers por ejecución para todo el servidor. Los
+        estados se comparan con los guardados en cada impresora: solo se actualizan
+        las que cambiaron y se envía una única notificación por el bus, que las
+        vistas de impresoras usan para actualizarse.
+
+        La actualización se hace por SQL sin modificar write_date: el sondeo no es
+        una edición de la impresora, y write_date define cuál es la predeterminada
+        más reciente en verificar_consistencia_predeterminada y en las migraciones.
+
+        Si la lectura fue rechazada por el limitador de peticiones no se cambia
+        nada: no hay información nueva del middleware y no es una caída.
+        """
+        impresoras = self.sudo().search([])
+        if not impresoras:
+            return
+
+        controller = self._get_controller()
+        impresoras_data = controller._consultar_api_externa('printers')
+        if controller.lectura_sin_presupuesto:
+            _logger.info("Presupuesto de lectura agotado, sondeo de estado omitido")
+            return
+
+        informados = {}
+        if impresoras_data is not None:
+            if impresoras_data:
+                # Igual que en la consulta de la lista: una respuesta vacía no reemplaza el inventario
+                self.env['impresoras.inventario.snapshot']._guardar_snapshot(impresoras_data)
+            informados = {
+                impresora.get('name'): self._leer_estado_middleware(impresora)
+                for impresora in impresoras_data
+            }
+
+        # Agrupar por valor las impresoras cuyo estado cambió: una sentencia por combinación
+        por_valor = {}
+        for impresora in impresoras:
+            if impresoras_data is None:
+                # Sin conexión con el middleware: el estado es desconocido
+                nuevo = ('desconocido', 0)
+            else:
+                # Las impresoras configuradas que el middleware no informa están fuera de línea
+                nuevo = informados.get(impresora.name, ('fuera_de_linea', 0))
+            if nuevo != (impresora.estado_api, impresora.trabajos_en_cola):
+                por_valor.setdefault(nuevo, []).append(impresora.id)
+        if not por_valor:
+            return
+
+        notificacion = []
+        for (estado, cola), ids in por_valor.items():
+            self.env.cr.execute("""
+                UPDATE impresoras
+                   SET estado_api = %s, trabajos_en_cola = %s
+                 WHERE id IN %s
+            """, [estado, cola, tuple(ids)])
+            notificacion.extend({
+                'id': impresora_id,
+                'estado_api': estado,
+                'trabajos_en_cola': cola,
+            } for impresora_id in ids)
+        impresoras.invalidate_recordset(['estado_api', 'trabajos_en_cola'])
+
+        self.env['bus.bus']._sendone(CANAL_ESTADO, NOTIFICACION_ESTADO, {'cambios': notificacion})
+        _logger.info(f"Estado de impresoras actualizado: {len(notificacion)} cambios publicados")
+
     # ==================== MÉTODOS DE UTILIDAD ====================
 
     @api.model
@@ -300,6 +470,20 @@ class Impresoras(models.Model):
         """
         return self.search([('es_predeterminada', '=', True)], limit=1)
 
+    def ultimos_trabajos(self, limite=20):
+        """
+        Obtiene los últimos trabajos de impresión de esta impresora.
+
+        Args:
+            limite (int): Cantidad máxima de trabajos a devolver
+
+        Returns:
+            recordset: Trabajos ordenados del más reciente al más antiguo
+        """
+        self.ensure_one()
+        return self.env['impresoras.trabajo'].search(
+            [('impresora_id', '=', self.id)], order='fecha desc, id desc', limit=limite)
+
     def verificar_consistencia_predeterminada(self):
         """
         Verifica la consistencia de las impresoras predeterminadas y corrige problemas.
@@ -347,18 +531,16 @@ class Impresoras(models.Model):
                 'count': 0
             }
 
+    @trazar_metodo
     def establecer_como_predeterminada(self):
         """
         Establece esta impresora como la predeterminada del sistema y envía
         la configuración a la API externa usando constantes.
         """
         try:
-            # Quitar marca de predeterminada a todas las demás impresoras
-            otras_impresoras = self.search([('id', '!=', self.id)])
-            otras_impresoras.write({'es_predeterminada': False})
-
-            # Marcar esta como predeterminada
-            self.es_predeterminada = True
+            # Marcar esta como predeterminada: write() desmarca las demás. El envío
+            # automático se omite porque se hace abajo, una sola vez, para informar el resultado
+            self.with_context(impresoras_sin_envio_automatico=True).write({'es_predeterminada': True})
 
             # Enviar configuración a API externa usando constantes
             controller = self._get_controller()
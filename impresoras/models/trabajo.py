@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+# Importaciones necesarias de Odoo y Python
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+from datetime import timedelta
+import logging
+
+# Logger para debug y errores
+_logger = logging.getLogger(__name__)
+
+# Días de historial que se conservan por defecto
+RETENCION_DIAS_DEFAULT = 90
+
+# Cantidad de filas eliminadas por sentencia en la purga del historial
+TAMANO_LOTE_PURGA = 50000
+
+
+class ImpresorasTrabajo(models.Model):
+    """
+    Historial de trabajos de impresión por impresora.
+
+    Tabla de solo inserción con un esquema compacto (sin columnas de auditoría)
+    pensada para millones de filas por mes. Las consultas de "últimos N trabajos
+    de una impresora" usan un índice compuesto y la purga por antigüedad se hace
+    en lotes con SQL, nunca registro por registro.
+    """
+
+    # ==================== CONFIGURACIÓN DEL MODELO ====================
+
+    _name = "impresoras.trabajo"
+    _description = "Trabajo de Impresión"
+    _order = "fecha desc, id desc"
+
+    # Sin create_uid/create_date/write_uid/write_date: las filas no se modifican
+    _log_access = False
+
+    # ==================== DEFINICIÓN DE CAMPOS ====================
+
+    # Impresora que recibió el trabajo (indexada en el índice compuesto de init)
+    impresora_id = fields.Many2one(
+        'impresoras',
+        string='Impresora',
+        required=True,
+        ondelete='cascade',
+        readonly=True,
+    )
+
+    # Momento en que se envió el trabajo
+    fecha = fields.Datetime(
+        string='Fecha',
+        required=True,
+        default=fields.Datetime.now,
+        readonly=True,
+    )
+
+    # Resultado del envío
+    estado = fields.Selection(
+        [('enviado', 'Enviado'), ('impreso', 'Impreso'), ('error', 'Error')],
+        string='Estado',
+        required=True,
+        default='enviado',
+        readonly=True,
+    )
+
+    # Reporte o documento impreso
+    documento = fields.Char(string='Documento', readonly=True)
+
+    # Tamaño del contenido enviado y duración del envío
+    tamano = fields.Integer(string='Tamaño (bytes)', readonly=True)
+    duracion_ms = fields.Integer(string='Duración (ms)', readonly=True)
+
+    def init(self):
+        """
+        Crea los índices del historial.
+
+        - Compuesto (impresora_id, fecha desc) para "últimos N trabajos de la impresora X"
+        - (fecha desc, id desc) para el listado general: sigue el _order, por lo que
+          "últimos 7 días, todas las impresoras" se lee en orden sin ordenar la semana
+        - BRIN sobre fecha para la purga por antigüedad: ocupa muy poco en una
+          tabla de solo inserción, donde el orden físico sigue al de fecha
+        """
+        create_index(
+            self.env.cr,
+            'impresoras_trabajo_impresora_fecha_idx',
+            self._table,
+            ['impresora_id', 'fecha DESC', 'id DESC'],
+        )
+        create_index(
+            self.env.cr,
+            'impresoras_trabajo_fecha_idx',
+            self._table,
+            ['fecha DESC', 'id DESC'],
+        )
+        create_index(
+            self.env.cr,
+            'impresoras_trabajo_fecha_brin_idx',
+            self._table,
+            ['fecha'],
+            method='brin',
+        )
+
+    # ==================== MÉTODOS DE REGISTRO ====================
+
+    @api.model
+    def _registrar_trabajos(self, vals_list):
+        """
+        Registra uno o varios trabajos de impresión en una sola inserción.
+
+        Método interno: se ejecuta con los permisos del entorno que lo llama,
+        el código de impresión debe usar sudo() si corresponde.
+
+        Args:
+            vals_list (list): Lista de diccionarios con impresora_id, estado, documento, etc.
+
+        Returns:
+            recordset: Trabajos creados
+        """
+        if isinstance(vals_list, dict):
+            vals_list = [vals_list]
+        return self.create(vals_list)
+
+    # ==================== RETENCIÓN DEL HISTORIAL ====================
+
+    @api.model
+    def _cron_purgar_historial(self):
+        """
+        Elimina los trabajos más antiguos que el período de retención.
+
+        Se borra en lotes de TAMANO_LOTE_PURGA filas con una sola sentencia por lote,
+        confirmando entre lotes para no mantener una transacción larga ni generar
+        un pico de tuplas muertas para el autovacuum.
+        """
+        valor = self.env['ir.config_parameter'].sudo().get_param(
+            'impresoras.trabajos_retencion_dias', RETENCION_DIAS_DEFAULT)
+        try:
+            dias = int(valor)
+        except (TypeError, ValueError):
+            dias = RETENCION_DIAS_DEFAULT
+        if dias <= 0:
+            return
+
+        limite = fields.Datetime.now() - timedelta(days=dias)
+        total = 0
+        while True:
+            self.env.cr.execute("""
+                DELETE FROM impresoras_trabajo
+                 WHERE id IN (
+                    SELECT id FROM impresoras_trabajo
+                     WHERE fecha < %s
+                     LIMIT %s
+                 )
+            """, [limite, TAMANO_LOTE_PURGA])
+            eliminados = self.env.cr.rowcount
+            total += eliminados
+            self.env.cr.commit()
+            if eliminados < TAMANO_LOTE_PURGA:
+                break
+
+        self.invalidate_model()
+        _logger.info(f"Historial de impresión: {total} trabajos anteriores a {limite} eliminados")
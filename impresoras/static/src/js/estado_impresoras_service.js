@@ -0,0 +1,37 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+
+/**
+ * Servicio que escucha los cambios de estado de las impresoras publicados por el
+ * sondeo del servidor (canal "impresoras_estado") y actualiza las vistas abiertas,
+ * para que cada pestaña del navegador no tenga que consultar el middleware.
+ */
+export const estadoImpresorasService = {
+    dependencies: ["bus_service", "action", "notification"],
+
+    start(env, { bus_service, action, notification }) {
+        bus_service.addChannel("impresoras_estado");
+        bus_service.subscribe("impresoras/estado", ({ cambios }) => {
+            const controller = action.currentController;
+            if (!controller || controller.props.resModel !== "impresoras") {
+                return;
+            }
+            if (controller.view.type === "list") {
+                // Recargar la lista sin perder filtros ni paginación
+                action.doAction({ type: "ir.actions.client", tag: "soft_reload" });
+            } else if (controller.view.type === "form") {
+                // En el formulario no se recarga para no interferir con la edición
+                const cambio = cambios.find((c) => c.id === controller.props.resId);
+                if (cambio) {
+                    notification.add(
+                        `Estado de la impresora actualizado. Trabajos en cola: ${cambio.trabajos_en_cola}`,
+                        { type: "info" }
+                    );
+                }
+            }
+        });
+    },
+};
+
+registry.category("services").add("impresoras_estado", estadoImpresorasService);
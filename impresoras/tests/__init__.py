@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+from . import test_rendimiento
+from . import test_inventario_snapshot
+from . import test_migracion
+from . import test_sondeo_estado
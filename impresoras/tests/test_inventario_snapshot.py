@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+# Pruebas del inventario guardado de impresoras: versionado por huella, límite
+# del historial y uso de la última versión cuando la API no responde.
+
+import time
+from unittest.mock import patch
+
+import requests
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.impresoras.controllers import controllers
+from odoo.addons.relex_api.models.rate_limit import RelexApiRateLimit
+
+from .test_rendimiento import _respuesta_simulada
+
+INVENTARIO = [{'name': 'Impresora A', 'port': '9100'}, {'name': 'Impresora B', 'port': '9101'}]
+INVENTARIO_NUEVO = [{'name': 'Impresora C', 'port': '9102'}]
+
+
+@tagged('post_install', '-at_install')
+class TestInventarioSnapshot(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Middleware simulado en el mismo proceso: ninguna petición sale a la red
+        cls.mock_get = cls.startClassPatcher(patch.object(requests, 'get'))
+        cls.mock_consumir = cls.startClassPatcher(patch.object(RelexApiRateLimit, '_consumir'))
+
+        cls.env['ir.config_parameter'].sudo().set_param('relex_api.api_base_url', 'http://middleware.test')
+        cls.snapshots = cls.env['impresoras.inventario.snapshot'].sudo()
+        cls.snapshots.search([]).unlink()
+
+    def setUp(self):
+        super().setUp()
+        self.mock_get.reset_mock(return_value=True, side_effect=True)
+        self.mock_get.return_value = _respuesta_simulada(INVENTARIO)
+        self.mock_consumir.reset_mock(return_value=True)
+        self.mock_consumir.return_value = True
+
+        # Estado por worker del controlador: cada prueba empieza con la API disponible
+        self._limpiar_estado_controlador()
+        self.addCleanup(self._limpiar_estado_controlador)
+
+        self.controller = self.env['impresoras']._get_controller()
+
+    def _limpiar_estado_controlador(self):
+        controllers._sin_conexion_hasta['valor'] = 0.0
+        controllers._ultimas_respuestas.clear()
+
+    def test_version_nueva_solo_si_cambia(self):
+        """Una respuesta igual a la última versión no crea otra; una distinta sí."""
+        self.snapshots._guardar_snapshot(INVENTARIO)
+        self.snapshots._guardar_snapshot(list(INVENTARIO))
+        self.assertEqual(self.snapshots.search([]).mapped('version'), [1])
+
+        self.snapshots._guardar_snapshot(INVENTARIO_NUEVO)
+        self.assertEqual(self.snapshots.search([]).mapped('version'), [2, 1])
+        datos, fecha = self.snapshots.obtener_ultimo()
+        self.assertEqual(datos, INVENTARIO_NUEVO)
+        self.assertTrue(fecha)
+
+    def test_limitar_historial(self):
+        """Se conservan solo las últimas impresoras.snapshots_max versiones."""
+        self.env['ir.config_parameter'].sudo().set_param('impresoras.snapshots_max', 3)
+        for i in range(5):
+            self.snapshots._guardar_snapshot([{'name': f'Impresora {i}', 'port': '9100'}])
+        self.assertEqual(self.snapshots.search([]).mapped('version'), [5, 4, 3])
+
+    def test_sin_conexion_usa_inventario_guardado(self):
+        """Si la API falla se sirve la última versión y no se reintenta la red durante la espera."""
+        self.snapshots._guardar_snapshot(INVENTARIO)
+        self.mock_get.side_effect = requests.exceptions.ConnectionError()
+
+        resultado = self.controller.consultar_impresoras_api_externa()
+        self.assertEqual(resultado, INVENTARIO)
+        self.assertTrue(self.controller.fecha_inventario_guardado)
+        self.assertGreater(controllers._sin_conexion_hasta['valor'], time.monotonic())
+
+        # Dentro de la espera: se sirve el inventario guardado sin consultar la red
+        self.mock_get.reset_mock()
+        self.mock_get.side_effect = None
+        self.mock_get.return_value = _respuesta_simulada(INVENTARIO_NUEVO)
+        self.assertEqual(self.controller.consultar_impresoras_api_externa(), INVENTARIO)
+        self.mock_get.assert_not_called()
+
+        # El refresco manual ignora la espera y, si la API responde, la termina
+        resultado = self.controller.consultar_impresoras_api_externa(forzar=True)
+        self.assertEqual(resultado, INVENTARIO_NUEVO)
+        self.assertFalse(self.controller.fecha_inventario_guardado)
+        self.assertEqual(controllers._sin_conexion_hasta['valor'], 0.0)
+        self.assertEqual(self.snapshots.obtener_ultimo()[0], INVENTARIO_NUEVO)
+
+    def test_presupuesto_agotado_no_es_sin_conexion(self):
+        """Una lectura rechazada por el limitador no marca la lista como sin conexión."""
+        self.snapshots._guardar_snapshot(INVENTARIO)
+        self.mock_consumir.return_value = False
+
+        resultado = self.controller.consultar_impresoras_api_externa()
+        self.assertEqual(resultado, INVENTARIO)
+        self.assertTrue(self.controller.lectura_sin_presupuesto)
+        self.assertFalse(self.controller.fecha_inventario_guardado)
+        self.assertEqual(controllers._sin_conexion_hasta['valor'], 0.0)
+        self.mock_get.assert_not_called()
+
+    def test_respuesta_vacia_no_reemplaza_inventario(self):
+        """Una respuesta vacía no se guarda como nueva versión."""
+        self.snapshots._guardar_snapshot(INVENTARIO)
+        self.mock_get.return_value = _respuesta_simulada([])
+
+        self.assertEqual(self.controller.consultar_impresoras_api_externa(), [])
+        self.assertEqual(self.snapshots.obtener_ultimo()[0], INVENTARIO)
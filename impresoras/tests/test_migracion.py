@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# Pruebas del procesamiento por lotes de las migraciones: recorrido completo
+# y reanudación desde un punto de control existente.
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.impresoras.migracion import _guardar_checkpoint, _leer_checkpoint, procesar_por_lotes
+
+SENTENCIA = """
+    UPDATE impresoras SET puerto = %(puerto)s
+     WHERE id > %(desde)s AND id <= %(hasta)s AND id IN %(ids)s
+"""
+
+
+@tagged('post_install', '-at_install')
+class TestMigracion(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.impresoras = cls.env['impresoras'].create([{
+            'name': f'Impresora migración {i}',
+            'direccion_ip': f'10.1.0.{i}',
+            'puerto': '9100',
+        } for i in range(7)]).sorted('id')
+
+    def _procesar(self, nombre):
+        """
+        Ejecuta el proceso de prueba por lotes de 2 ids, sin confirmar la transacción.
+
+        Returns:
+            int: Filas afectadas
+        """
+        self.env.flush_all()
+        total = procesar_por_lotes(self.env.cr, nombre, 'impresoras', SENTENCIA, params={
+            'puerto': '9999',
+            'ids': tuple(self.impresoras.ids),
+        }, tamano_lote=2, commit=False)
+        self.impresoras.invalidate_recordset(['puerto'])
+        return total
+
+    def test_procesa_todas_las_filas(self):
+        """Sin punto de control se recorre toda la tabla y el punto de control se elimina al terminar."""
+        self.assertEqual(self._procesar('prueba_completa'), len(self.impresoras))
+        self.assertEqual(set(self.impresoras.mapped('puerto')), {'9999'})
+        self.assertEqual(_leer_checkpoint(self.env.cr, 'prueba_completa'), 0)
+
+    def test_retoma_desde_checkpoint(self):
+        """Con un punto de control guardado solo se procesan los ids posteriores."""
+        procesadas, pendientes = self.impresoras[:3], self.impresoras[3:]
+        _guardar_checkpoint(self.env.cr, 'prueba_retomar', procesadas[-1].id)
+
+        self.assertEqual(self._procesar('prueba_retomar'), len(pendientes))
+        self.assertEqual(set(procesadas.mapped('puerto')), {'9100'})
+        self.assertEqual(set(pendientes.mapped('puerto')), {'9999'})
+        self.assertEqual(_leer_checkpoint(self.env.cr, 'prueba_retomar'), 0)
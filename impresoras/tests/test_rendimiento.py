@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# Pruebas de rendimiento del modelo impresoras: cantidad de consultas SQL y
+# latencia máxima de los métodos principales con 1, 100 y 10.000 impresoras.
+#
+# assertQueryCount falla si se ejecutan MÁS consultas que las indicadas, por lo
+# que los valores son cotas superiores: una regresión (ej. una búsqueda o una
+# escritura por registro) las supera, y al mejorar basta con bajar el número.
+
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tests.common import warmup
+
+from odoo.addons.relex_api.models.rate_limit import RelexApiRateLimit
+
+
+def _respuesta_simulada(datos):
+    """
+    Crea una respuesta HTTP simulada para el mock del middleware.
+
+    Args:
+        datos: Contenido JSON de la respuesta
+
+    Returns:
+        MagicMock: Objeto con la interfaz usada de requests.Response
+    """
+    respuesta = MagicMock()
+    respuesta.content = b'{}'
+    respuesta.json.return_value = datos
+    respuesta.raise_for_status.return_value = None
+    return respuesta
+
+
+class RendimientoImpresorasMixin:
+    """
+    Pruebas comunes; cada subclase define la cantidad de impresoras y la latencia máxima.
+    """
+
+    # Cantidad de impresoras creadas para la prueba
+    CANTIDAD = 1
+
+    # Latencia máxima por llamada, en segundos
+    LATENCIA_MAX = 0.5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Middleware simulado en el mismo proceso: ninguna petición sale a la red
+        cls.mock_get = cls.startClassPatcher(patch.object(
+            requests, 'get', return_value=_respuesta_simulada([{'name': 'Impresora 0', 'port': '9100'}])))
+        cls.mock_post = cls.startClassPatcher(patch.object(
+            requests, 'post', return_value=_respuesta_simulada({})))
+
+        # El limitador usa un cursor propio; en pruebas siempre hay presupuesto
+        cls.startClassPatcher(patch.object(RelexApiRateLimit, '_consumir', return_value=True))
+
+        cls.env['ir.config_parameter'].sudo().set_param('relex_api.api_base_url', 'http://middleware.test')
+
+        cls.impresoras = cls.env['impresoras'].create([{
+            'name': f'Impresora {i}',
+            'direccion_ip': f'10.0.{i // 256}.{i % 256}',
+            'puerto': '9100',
+        } for i in range(cls.CANTIDAD)])
+        cls.impresoras[0].es_predeterminada = True
+        cls.predeterminada = cls.impresoras[0]
+        cls.otra = cls.impresoras[-1]
+
+    @contextmanager
+    def _medir(self, consultas):
+        """
+        Verifica la cantidad máxima de consultas SQL y la latencia de un bloque.
+
+        La latencia solo se verifica en la pasada "caliente" de @warmup: la primera
+        pasada incluye la carga de cachés y no es representativa.
+
+        Args:
+            consultas (int): Cantidad máxima de consultas SQL permitidas
+        """
+        inicio = time.perf_counter()
+        with self.assertQueryCount(consultas):
+            yield
+        duracion = time.perf_counter() - inicio
+        if not self.warm:
+            return
+        self.assertLess(
+            duracion, self.LATENCIA_MAX,
+            f"Latencia {duracion:.3f}s supera {self.LATENCIA_MAX}s con {self.CANTIDAD} impresoras")
+
+    @warmup
+    def test_write_predeterminada(self):
+        """write() marcando una impresora como predeterminada."""
+        with self._medir(8):
+            self.otra.write({'es_predeterminada': True})
+        self.assertTrue(self.otra.es_predeterminada)
+
+    @warmup
+    def test_write_sin_predeterminada(self):
+        """write() de campos comunes no debe buscar otras impresoras."""
+        with self._medir(2):
+            self.otra.write({'name': 'Renombrada'})
+
+    @warmup
+    def test_check_una_predeterminada(self):
+        """Constraint de unicidad de la impresora predeterminada."""
+        with self._medir(1):
+            self.predeterminada._check_una_predeterminada()
+
+    @warmup
+    def test_obtener_impresora_predeterminada(self):
+        """Búsqueda de la impresora predeterminada."""
+        with self._medir(1):
+            predeterminada = self.env['impresoras'].obtener_impresora_predeterminada()
+        self.assertEqual(predeterminada, self.predeterminada)
+
+    @warmup
+    def test_verificar_consistencia_predeterminada(self):
+        """Verificación de consistencia con una sola predeterminada."""
+        with self._medir(2):
+            resultado = self.env['impresoras'].verificar_consistencia_predeterminada()
+        self.assertEqual(resultado['status'], 'consistente')
+
+    @warmup
+    def test_establecer_como_predeterminada(self):
+        """Cambio de predeterminada: no debe escribir todas las demás impresoras."""
+        self.mock_post.reset_mock()
+        with self._medir(10):
+            resultado = self.otra.establecer_como_predeterminada()
+        self.assertEqual(resultado['params']['type'], 'success')
+        # Una sola petición POST al middleware por cambio de predeterminada
+        self.assertEqual(self.mock_post.call_count, 1)
+        self.assertEqual(self.env['impresoras'].obtener_impresora_predeterminada(), self.otra)
+
+
+@tagged('post_install', '-at_install')
+class TestRendimientoImpresoras1(RendimientoImpresorasMixin, TransactionCase):
+    CANTIDAD = 1
+    LATENCIA_MAX = 0.5
+
+
+@tagged('post_install', '-at_install')
+class TestRendimientoImpresoras100(RendimientoImpresorasMixin, TransactionCase):
+    CANTIDAD = 100
+    LATENCIA_MAX = 0.5
+
+
+@tagged('post_install', '-at_install')
+class TestRendimientoImpresoras10000(RendimientoImpresorasMixin, TransactionCase):
+    CANTIDAD = 10000
+    LATENCIA_MAX = 2.0
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Pruebas del sondeo periódico de estado: solo se actualizan las impresoras que
+# cambiaron, sin modificar write_date, con una única notificación por el bus.
+
+from unittest.mock import patch
+
+import requests
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.impresoras.controllers import controllers
+from odoo.addons.impresoras.models.models import CANAL_ESTADO, NOTIFICACION_ESTADO
+from odoo.addons.relex_api.models.rate_limit import RelexApiRateLimit
+
+from .test_rendimiento import _respuesta_simulada
+
+RESPUESTA = [
+    {'name': 'Sondeo A', 'port': '9100', 'status': 'online', 'queue': 0},
+    {'name': 'Sondeo B', 'port': '9100', 'status': 'paper_out', 'queue': 3},
+]
+
+
+@tagged('post_install', '-at_install')
+class TestSondeoEstado(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Middleware simulado en el mismo proceso: ninguna petición sale a la red
+        cls.mock_get = cls.startClassPatcher(patch.object(
+            requests, 'get', return_value=_respuesta_simulada(RESPUESTA)))
+        cls.mock_consumir = cls.startClassPatcher(patch.object(RelexApiRateLimit, '_consumir', return_value=True))
+        cls.mock_sendone = cls.startClassPatcher(patch.object(cls.registry['bus.bus'], '_sendone'))
+
+        cls.env['ir.config_parameter'].sudo().set_param('relex_api.api_base_url', 'http://middleware.test')
+
+        # A ya tiene el estado informado; B cambia; C no está en la respuesta
+        cls.impresora_a, cls.impresora_b, cls.impresora_c = cls.env['impresoras'].create([{
+            'name': f'Sondeo {letra}',
+            'direccion_ip': f'10.2.0.{i}',
+            'puerto': '9100',
+        } for i, letra in enumerate('ABC')])
+        cls.impresoras = cls.impresora_a | cls.impresora_b | cls.impresora_c
+        cls.env.flush_all()
+        cls.env.cr.execute("""
+            UPDATE impresoras SET estado_api = 'en_linea', trabajos_en_cola = 0 WHERE id = %s
+        """, [cls.impresora_a.id])
+        cls.impresoras.invalidate_recordset(['estado_api', 'trabajos_en_cola'])
+
+    def setUp(self):
+        super().setUp()
+        self.mock_sendone.reset_mock()
+        self.mock_consumir.return_value = True
+        controllers._ultimas_respuestas.clear()
+        self.addCleanup(controllers._ultimas_respuestas.clear)
+
+    def _cambios_publicados(self):
+        """
+        Obtiene los cambios de estas impresoras publicados en la única notificación enviada.
+
+        Returns:
+            dict: {id: (estado_api, trabajos_en_cola)}
+        """
+        self.mock_sendone.assert_called_once()
+        canal, tipo, mensaje = self.mock_sendone.call_args.args
+        self.assertEqual((canal, tipo), (CANAL_ESTADO, NOTIFICACION_ESTADO))
+        return {
+            cambio['id']: (cambio['estado_api'], cambio['trabajos_en_cola'])
+            for cambio in mensaje['cambios']
+            if cambio['id'] in self.impresoras.ids
+        }
+
+    def test_solo_actualiza_cambios(self):
+        """Solo se actualizan y publican las impresoras cuyo estado cambió, sin tocar write_date."""
+        write_dates = {impresora.id: impresora.write_date for impresora in self.impresoras}
+
+        self.env['impresoras']._cron_sondear_estado()
+
+        self.assertEqual(self._cambios_publicados(), {
+            self.impresora_b.id: ('sin_papel', 3),
+            self.impresora_c.id: ('fuera_de_linea', 0),
+        })
+        self.assertEqual(
+            [(impresora.estado_api, impresora.trabajos_en_cola) for impresora in self.impresoras],
+            [('en_linea', 0), ('sin_papel', 3), ('fuera_de_linea', 0)])
+        self.assertEqual({impresora.id: impresora.write_date for impresora in self.impresoras}, write_dates)
+
+    def test_sin_cambios_no_notifica(self):
+        """Una segunda ejecución con la misma respuesta no escribe ni notifica."""
+        self.env['impresoras']._cron_sondear_estado()
+        self.mock_sendone.reset_mock()
+
+        with patch.object(self.env.cr, 'execute', wraps=self.env.cr.execute) as mock_execute:
+            self.env['impresoras']._cron_sondear_estado()
+        self.mock_sendone.assert_not_called()
+        self.assertFalse([
+            llamada for llamada in mock_execute.call_args_list
+            if 'UPDATE impresoras' in str(llamada.args[0])
+        ])
+
+    def test_presupuesto_agotado_no_cambia_estados(self):
+        """Un sondeo rechazado por el limitador no marca las impresoras como desconocidas."""
+        self.mock_consumir.return_value = False
+
+        self.env['impresoras']._cron_sondear_estado()
+
+        self.mock_sendone.assert_not_called()
+        self.assertEqual(self.impresora_a.estado_api, 'en_linea')
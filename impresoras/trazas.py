@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Trazas de las llamadas al middleware de impresoras.
+
+Guarda en memoria (por worker) las últimas llamadas HTTP realizadas, con sus
+tiempos y el método del modelo que las originó, para encontrar qué acciones
+del usuario hacen lento el formulario de impresoras.
+"""
+
+import collections
+import functools
+import threading
+
+# Cantidad de trazas que se conservan en memoria por worker
+TRAZAS_MAX = 500
+
+# Buffer circular con las últimas trazas (las más antiguas se descartan solas)
+_trazas = collections.deque(maxlen=TRAZAS_MAX)
+_trazas_lock = threading.Lock()
+
+# Pila de métodos del modelo en ejecución, por hilo
+_contexto = threading.local()
+
+
+def trazar_metodo(func):
+    """
+    Decorador para los métodos del modelo que llaman al middleware.
+
+    Registra el nombre del método mientras se ejecuta, para que las trazas
+    de las llamadas HTTP indiquen qué acción las originó.
+
+    Args:
+        func (callable): Método a decorar
+
+    Returns:
+        callable: Método decorado
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        pila = getattr(_contexto, 'pila', None)
+        if pila is None:
+            pila = _contexto.pila = []
+        pila.append(f"{self._name}.{func.__name__}")
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            pila.pop()
+    return wrapper
+
+
+def metodo_actual():
+    """
+    Obtiene el método del modelo que se está ejecutando en este hilo.
+
+    Returns:
+        str: Nombre del método (modelo.metodo) o cadena vacía si no hay ninguno
+    """
+    pila = getattr(_contexto, 'pila', None)
+    return pila[-1] if pila else ''
+
+
+def registrar_traza(traza):
+    """
+    Agrega una traza al buffer circular.
+
+    Args:
+        traza (dict): Datos de la llamada (endpoint, tiempos, tamaños, método, usuario)
+    """
+    with _trazas_lock:
+        _trazas.append(traza)
+
+
+def ultimas_trazas(limite=None):
+    """
+    Obtiene las últimas trazas registradas en este worker.
+
+    Args:
+        limite (int): Cantidad máxima de trazas a devolver (todas por defecto)
+
+    Returns:
+        list: Trazas ordenadas de la más reciente a la más antigua
+    """
+    with _trazas_lock:
+        trazas = list(reversed(_trazas))
+    return trazas[:limite] if limite else trazas
@@ -31,6 +31,7 @@ Características:
 
     # --- Archivos de datos XML/CSV -------------------------------------------
     "data": [
+        "security/ir.model.access.csv",
         "views/res_config_settings_views.xml",
     ],
 
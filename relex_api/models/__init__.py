@@ -1 +1,2 @@
-from . import res_config_settings
\ No newline at end of file
+from . import res_config_settings
+from . import rate_limit
\ No newline at end of file
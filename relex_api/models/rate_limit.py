@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Limitador de peticiones hacia la API de Relex.
+
+Implementa un token bucket compartido entre todos los workers de Odoo,
+almacenado en la base de datos para proteger al middleware de impresoras.
+"""
+
+import logging
+import time
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Presupuestos por defecto: (capacidad del bucket, peticiones por minuto)
+PRESUPUESTOS_DEFAULT = {
+    'lectura': (30, 60),
+    'escritura': (10, 20),
+}
+
+
+class RelexApiRateLimit(models.Model):
+    """
+    Bucket de tokens para limitar las peticiones a la API.
+
+    Cada fila es un bucket ('lectura', 'escritura'). El consumo de un token se
+    hace en una sola sentencia SQL sobre un cursor propio, de modo que varios
+    workers comparten el mismo presupuesto sin bloquear la transacción del usuario.
+    """
+    _name = 'relex_api.rate.limit'
+    _description = 'Límite de peticiones a la API de Relex'
+    _log_access = False
+
+    _sql_constraints = [
+        ('name_unique', 'unique(name)', 'El bucket de peticiones debe ser único.'),
+    ]
+
+    # Nombre del bucket ('lectura' o 'escritura')
+    name = fields.Char(string="Bucket", required=True)
+
+    # Tokens disponibles en el último consumo
+    tokens = fields.Float(string="Tokens")
+
+    # Marca de tiempo (epoch) del último consumo
+    actualizado = fields.Float(string="Actualizado")
+
+    @api.model
+    def _get_presupuesto(self, bucket):
+        """
+        Obtiene la capacidad y la tasa de recarga configuradas para un bucket.
+
+        Args:
+            bucket (str): Nombre del bucket ('lectura' o 'escritura')
+
+        Returns:
+            tuple: (capacidad, tokens por segundo)
+        """
+        capacidad_default, por_minuto_default = PRESUPUESTOS_DEFAULT[bucket]
+        param = self.env['ir.config_parameter'].sudo()
+        try:
+            por_minuto = float(param.get_param(f'relex_api.rate_{bucket}', por_minuto_default))
+            capacidad = float(param.get_param(f'relex_api.rate_{bucket}_rafaga', capacidad_default))
+        except (TypeError, ValueError):
+            por_minuto, capacidad = por_minuto_default, capacidad_default
+        return max(capacidad, 1.0), max(por_minuto, 0.0) / 60.0
+
+    @api.model
+    def _consumir(self, bucket):
+        """
+        Intenta consumir un token del bucket indicado.
+
+        Args:
+            bucket (str): Nombre del bucket ('lectura' o 'escritura')
+
+        Returns:
+            bool: True si la petición está dentro del presupuesto, False si debe limitarse
+        """
+        capacidad, tasa = self._get_presupuesto(bucket)
+        ahora = time.time()
+        try:
+            # Cursor propio: el token se consume aunque la transacción del usuario
+            # se revierta, y la fila no queda bloqueada hasta el final de la petición
+            with self.env.registry.cursor() as cr:
+                cr.execute("""
+                    INSERT INTO relex_api_rate_limit AS b (name, tokens, actualizado)
+                    VALUES (%(bucket)s, %(capacidad)s - 1, %(ahora)s)
+                    ON CONFLICT (name) DO UPDATE
+                       SET tokens = LEAST(%(capacidad)s, b.tokens + (%(ahora)s - b.actualizado) * %(tasa)s) - 1,
+                           actualizado = %(ahora)s
+                     WHERE LEAST(%(capacidad)s, b.tokens + (%(ahora)s - b.actualizado) * %(tasa)s) >= 1
+                    RETURNING tokens
+                """, {'bucket': bucket, 'capacidad': capacidad, 'tasa': tasa, 'ahora': ahora})
+                return bool(cr.fetchone())
+        except Exception as e:
+            # Si el limitador falla no se bloquea la comunicación con la API
+            _logger.error(f"Error en el limitador de peticiones '{bucket}': {e}")
+            return True
@@ -25,3 +25,20 @@ class ResConfigSettings(models.TransientModel):
         help="URL base para la API de impresoras Relex. "
              "Ejemplo: https://api.relex.com/v1"
     )
+
+    # Presupuesto de peticiones de lectura (GET) por minuto, compartido entre workers
+    api_rate_lectura = fields.Integer(
+        string="Lecturas por minuto",
+        config_parameter='relex_api.rate_lectura',
+        default=60,
+        help="Cantidad máxima de consultas GET por minuto hacia la API. "
+             "Al superarla se usa la última respuesta válida."
+    )
+
+    # Presupuesto de peticiones de escritura (POST) por minuto, compartido entre workers
+    api_rate_escritura = fields.Integer(
+        string="Escrituras por minuto",
+        config_parameter='relex_api.rate_escritura',
+        default=20,
+        help="Cantidad máxima de envíos POST por minuto hacia la API."
+    )